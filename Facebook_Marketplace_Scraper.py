@@ -9,26 +9,206 @@ The data is saved to a CSV file for further analysis.
 Requirements:
 - splinter
 - BeautifulSoup4
-- pandas
-- matplotlib
+- lxml
+- selectolax
+- numpy
+- pandas (only for plotting)
+- matplotlib (only for plotting)
 - webdriver_manager
+- orjson
+- playwright (only for scrape_many)
 - browserless-client
 """
 
+import atexit
+import csv
+import multiprocessing
 import re
 import time
 import os
 import sys
+import threading
 import argparse
-import pandas as pd
-import matplotlib.pyplot as plt
+import asyncio
+from itertools import zip_longest
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from bs4 import BeautifulSoup as soup
+from bs4 import BeautifulSoup as soup, SoupStrainer
+from selectolax.lexbor import LexborHTMLParser
 from splinter import Browser
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
-import json
-from browserless_client import BrowserlessClient
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+import orjson
+from browserless_client import get_shared_client
+
+# Patterns used for every listing, compiled once
+_KM_RE = re.compile(r'(?:(\d+)K|(\d+(?:,\d+)*))\s*km', re.I)
+_PRICE_STRIP_RE = re.compile(r'[^\d.]')
+_TITLE_RE = re.compile(r'\s*(\d{4})\s+(\S+)\s+(\S+)')
+
+# Blocks the HTML fallback never looks at, removed before parsing to shrink the input
+_NOISE_RE = re.compile(r'<(style|script|svg)\b[^>]*>.*?</\1\s*>', re.S | re.I)
+
+
+def _parse_title(title):
+    """Split a listing title such as '2018 Honda Civic LX' into (year, make, model), or None if it doesn't fit"""
+    title_match = _TITLE_RE.match(title)
+    if not title_match:
+        return None
+    year, make, model = title_match.groups()
+    return int(year), make, model
+
+
+def _parse_mileage(text):
+    """Convert mileage text such as '85K km' or '120,000 km' to an integer (0 if not found)"""
+    mileage_match = _KM_RE.search(text)
+    if not mileage_match:
+        return 0
+    thousands, full = mileage_match.groups()
+    if thousands:
+        return int(thousands) * 1000
+    return int(full.replace(',', ''))
+
+
+def _write_debug(path, html):
+    """Write an HTML snapshot to disk (runs on the scraper's debug writer thread)"""
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+    except OSError as e:
+        print(f"Error saving HTML to {path}: {e}")
+
+
+# Column order of the saved CSV
+_CSV_FIELDS = ['Year', 'Make', 'Model', 'Price', 'Mileage', 'URL', 'ImageURL']
+
+
+def _column_stats(column):
+    """Return (min, max, mean) over the non-zero entries of a numpy column, or None if there are none"""
+    values = column[column != 0]
+    if not values.size:
+        return None
+    return values.min(), values.max(), values.mean()
+
+
+# Returned when scraping is not possible
+_SAMPLE_DATA = (
+    {
+        "Year": 2018, 
+        "Make": "Honda", 
+        "Model": "Civic", 
+        "Price": 15995, 
+        "Mileage": 78500, 
+        "URL": "https://www.facebook.com/marketplace/item/sample1",
+        "ImageURL": "https://upload.wikimedia.org/wikipedia/commons/thumb/5/57/2018_Honda_Civic_SE_1.4_Front.jpg/1200px-2018_Honda_Civic_SE_1.4_Front.jpg"
+    },
+    {
+        "Year": 2017, 
+        "Make": "Toyota", 
+        "Model": "Corolla", 
+        "Price": 14500, 
+        "Mileage": 65000, 
+        "URL": "https://www.facebook.com/marketplace/item/sample2",
+        "ImageURL": "https://upload.wikimedia.org/wikipedia/commons/thumb/f/f6/2017_Toyota_Corolla_%28ZRE172R%29_Ascent_sedan_%282018-11-02%29_01.jpg/1200px-2017_Toyota_Corolla_%28ZRE172R%29_Ascent_sedan_%282018-11-02%29_01.jpg"
+    },
+    {
+        "Year": 2019, 
+        "Make": "Mazda", 
+        "Model": "3", 
+        "Price": 17995, 
+        "Mileage": 45000, 
+        "URL": "https://www.facebook.com/marketplace/item/sample3",
+        "ImageURL": "https://upload.wikimedia.org/wikipedia/commons/thumb/8/8c/2019_Mazda3_Sport_2.5L_AWD_%28North_America%29_front_NYIAS_2019.jpg/1200px-2019_Mazda3_Sport_2.5L_AWD_%28North_America%29_front_NYIAS_2019.jpg"
+    },
+    {
+        "Year": 2016, 
+        "Make": "Hyundai", 
+        "Model": "Elantra", 
+        "Price": 12500, 
+        "Mileage": 89000, 
+        "URL": "https://www.facebook.com/marketplace/item/sample4",
+        "ImageURL": "https://upload.wikimedia.org/wikipedia/commons/thumb/c/c5/2016_Hyundai_Elantra_%28AD%29_Elite_sedan_%282018-11-02%29_01.jpg/1200px-2016_Hyundai_Elantra_%28AD%29_Elite_sedan_%282018-11-02%29_01.jpg"
+    },
+    {
+        "Year": 2020, 
+        "Make": "Nissan", 
+        "Model": "Sentra", 
+        "Price": 18995, 
+        "Mileage": 32000, 
+        "URL": "https://www.facebook.com/marketplace/item/sample5",
+        "ImageURL": "https://upload.wikimedia.org/wikipedia/commons/thumb/f/fd/2020_Nissan_Sentra_SR%2C_front_12.21.19.jpg/1200px-2020_Nissan_Sentra_SR%2C_front_12.21.19.jpg"
+    }
+)
+
+
+# Process pool for decoding listing scripts, shared by every scrape and created on first use
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+def _get_parse_pool():
+    """
+    Return the shared script-parsing process pool, creating it on first use
+    
+    Workers are spawned rather than forked, since callers (scrape_many, Streamlit) run in
+    threads of a multi-threaded process, which fork does not copy safely.
+    """
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            atexit.register(_parse_pool.shutdown)
+        return _parse_pool
+
+
+# Resource types the listing data never depends on; aborted so pages download far fewer bytes
+_BLOCKED_RESOURCES = frozenset({'image', 'font', 'media', 'stylesheet'})
+
+
+async def _block_heavy_resources(route):
+    """Playwright route handler that aborts requests for _BLOCKED_RESOURCES"""
+    if route.request.resource_type in _BLOCKED_RESOURCES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# Keys whose values never hold listings; not worth walking into
+_SKIP_JSON_KEYS = frozenset({'__typename', 'id', 'tracking'})
+
+
+def _find_listing_nodes(data):
+    """
+    Collect every listing dict (one carrying 'marketplace_listing_title') from nested JSON data
+    
+    Uses an explicit stack rather than recursion, since Marketplace payloads nest dozens of levels deep.
+    Listings are returned in document order.
+    """
+    found = []
+    stack = deque([data])
+    while stack:
+        obj = stack.pop()
+        obj_type = type(obj)
+        if obj_type is dict:
+            if 'marketplace_listing_title' in obj:
+                found.append(obj)
+                continue
+            stack.extend(
+                value for key, value in reversed(obj.items())
+                if key not in _SKIP_JSON_KEYS and type(value) in (dict, list)
+            )
+        elif obj_type is list:
+            stack.extend(reversed(obj))
+    return found
+
 
 class FacebookMarketplaceScraper:
     def __init__(self, headless=True, debug=True):
@@ -43,6 +223,14 @@ class FacebookMarketplaceScraper:
         self.debug = debug
         self.browser = None
         self.listings = []
+        self._debug_writer = None
+        
+        # Figure reused across plot_data calls, created on first use
+        self._fig = None
+        self._ax = None
+        
+        # Only the embedded JSON scripts are needed from the page, so skip building the rest of the DOM
+        self.only_json_scripts = SoupStrainer('script', attrs={'type': 'application/json'})
         
         # Create output directory if it doesn't exist
         self.output_dir = "marketplace_output"
@@ -65,7 +253,6 @@ class FacebookMarketplaceScraper:
                     display.start()
                     
                     # Configure Chrome options for cloud
-                    from selenium.webdriver.chrome.options import Options
                     chrome_options = Options()
                     chrome_options.add_argument('--headless')
                     chrome_options.add_argument('--no-sandbox')
@@ -82,9 +269,20 @@ class FacebookMarketplaceScraper:
                     traceback.print_exc()
                     return False
             else:
-                # Local environment setup
+                # Local environment setup, trimmed down since only the page markup is scraped
+                chrome_options = Options()
+                chrome_options.add_argument('--disable-gpu')
+                chrome_options.add_argument('--disable-extensions')
+                chrome_options.add_argument('--disable-dev-shm-usage')
+                chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+                chrome_options.add_experimental_option(
+                    "prefs", {"profile.managed_default_content_settings.images": 2}
+                )
+                # Return from visit() at DOMContentLoaded rather than waiting for every resource
+                chrome_options.page_load_strategy = 'eager'
+                
                 service = Service(ChromeDriverManager().install())
-                self.browser = Browser('chrome', headless=self.headless, service=service)
+                self.browser = Browser('chrome', headless=self.headless, service=service, options=chrome_options)
                 
             print("Browser initialized successfully")
             return True
@@ -95,7 +293,11 @@ class FacebookMarketplaceScraper:
             return False
     
     def close_browser(self):
-        """Close the browser"""
+        """Close the browser and wait for any pending debug HTML writes"""
+        if self._debug_writer:
+            self._debug_writer.shutdown(wait=True)
+            self._debug_writer = None
+        
         if self.browser:
             try:
                 self.browser.quit()
@@ -104,6 +306,21 @@ class FacebookMarketplaceScraper:
             except Exception as e:
                 print(f"Error closing browser: {e}")
     
+    def _save_debug_html(self, prefix, timestamp, html):
+        """
+        Queue an HTML snapshot for writing on a background thread
+        
+        Args:
+            prefix (str): File name prefix
+            timestamp (str): Timestamp of the current scrape
+            html (str): HTML content to save
+        """
+        if self._debug_writer is None:
+            self._debug_writer = ThreadPoolExecutor(max_workers=1)
+        debug_file = os.path.join(self.output_dir, f"{prefix}_{timestamp}.html")
+        self._debug_writer.submit(_write_debug, debug_file, html)
+        print(f"Saving HTML to {debug_file}")
+    
     def build_search_url(self, location, min_price=None, max_price=None, days_listed=None, 
                          min_mileage=None, max_mileage=None, min_year=None, max_year=None, 
                          transmission=None, make=None, model=None):
@@ -171,13 +388,17 @@ class FacebookMarketplaceScraper:
         
         Args:
             url (str): Search URL
-            scroll_count (int): Number of times to scroll the page
+            scroll_count (int): Number of times to scroll the page (with Browserless, the
+                                number of extra result pages fetched over GraphQL)
             scroll_delay (int): Delay between scrolls in seconds
             
         Returns:
             list: List of dictionaries containing listing data
         """
         try:
+            # Shared by all debug snapshots of this scrape
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            
             # Check if we're in a cloud environment where browser might not work
             is_cloud = os.environ.get('RENDER', False) or os.environ.get('DYNO', False)
             
@@ -185,36 +406,40 @@ class FacebookMarketplaceScraper:
             if is_cloud:
                 print("Running in cloud environment. Using Browserless.io for scraping.")
                 try:
-                    # Initialize Browserless client
-                    browserless = BrowserlessClient()
+                    # Reuse the process-wide Browserless client and its open connections
+                    browserless = get_shared_client()
                     
-                    # Scrape the page with Browserless
-                    html_content = browserless.scrape_page(
+                    # Load the first page with Browserless, capturing the request it uses to paginate
+                    capture = browserless.capture_graphql(
                         url=url,
                         selector=".x1gslohp",  # Wait for marketplace listings container
-                        scroll_count=scroll_count,
-                        scroll_delay=scroll_delay
+                        include_html=self.debug
                     )
                     
-                    if not html_content:
-                        print("Failed to get HTML content from Browserless. Returning sample data.")
+                    if not capture or not (capture.get('json') or capture.get('html')):
+                        print("Failed to get content from Browserless. Returning sample data.")
                         return self._get_sample_data()
                     
+                    # HTML is only sent back when the in-browser JSON extraction found nothing
+                    html_content = capture.get('html')
+                    
                     # Save HTML for debugging if needed
-                    if self.debug:
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        debug_file = os.path.join(self.output_dir, f"marketplace_html_browserless_{timestamp}.html")
-                        with open(debug_file, "w", encoding="utf-8") as f:
-                            f.write(html_content)
-                        print(f"Saved HTML to {debug_file}")
+                    if self.debug and html_content:
+                        self._save_debug_html("marketplace_html_browserless", timestamp, html_content)
+                    
+                    # Fetch further pages straight from the GraphQL endpoint instead of scrolling
+                    graphql_pages = asyncio.run(browserless.fetch_graphql_pages(capture, scroll_count))
                     
-                    # Extract JSON data from HTML
-                    json_data = browserless.extract_json_from_html(html_content)
+                    # Use the JSON extracted in the browser, parsing the HTML only when that found nothing
+                    json_data = capture.get('json') or browserless.extract_json_from_html(html_content)
                     
-                    if json_data:
+                    if json_data or graphql_pages:
                         # Process JSON data
                         vehicles_list = []
-                        self._process_json_data(json_data, vehicles_list)
+                        if json_data:
+                            self._process_json_data(json_data, vehicles_list)
+                        for payload in graphql_pages:
+                            self._process_json_data(payload, vehicles_list)
                         
                         if vehicles_list:
                             self.listings = vehicles_list
@@ -224,97 +449,14 @@ class FacebookMarketplaceScraper:
                     else:
                         print("No JSON data found. Falling back to HTML parsing.")
                     
+                    # The HTML isn't sent back when the in-browser lookup found JSON, so fetch it now
+                    if not html_content:
+                        html_content = browserless.scrape_page(url=url, selector=".x1gslohp")
+                    
                     # If JSON extraction failed, try parsing HTML directly
-                    market_soup = soup(html_content, 'html.parser')
                     vehicles_list = []
-                    
-                    # Extract listings from HTML
-                    listing_containers = market_soup.find_all('div', class_='x1gslohp')
-                    
-                    # Process HTML listings
-                    for container in listing_containers:
-                        try:
-                            # Look for title elements
-                            title_elem = None
-                            for span in container.find_all('span'):
-                                if span.text and len(span.text.split()) >= 3 and span.text.split()[0].isdigit():
-                                    title_elem = span
-                                    break
-                            
-                            if not title_elem:
-                                continue
-                            
-                            # Look for price elements
-                            price_elem = None
-                            for span in container.find_all('span'):
-                                if span.text and '$' in span.text:
-                                    price_elem = span
-                                    break
-                            
-                            if not price_elem:
-                                continue
-                            
-                            # Look for URL
-                            url_elem = container.find('a', href=True)
-                            if not url_elem:
-                                continue
-                            
-                            # Process the data
-                            title_text = title_elem.text.strip()
-                            price_text = price_elem.text.strip()
-                            url_text = url_elem.get('href')
-                            
-                            # Extract mileage from any span that mentions km
-                            mileage_text = "0 km"
-                            for span in container.find_all('span'):
-                                if span.text and 'km' in span.text.lower():
-                                    mileage_text = span.text.strip()
-                                    break
-                            
-                            # Create car dictionary
-                            cars_dict = {}
-                            title_split = title_text.split()
-                            
-                            # Skip if title doesn't have at least 3 parts (year, make, model)
-                            if len(title_split) < 3:
-                                continue
-                            
-                            # Try to parse year as integer
-                            try:
-                                cars_dict["Year"] = int(title_split[0])
-                            except ValueError:
-                                # Skip if year is not a valid integer
-                                continue
-                            
-                            cars_dict["Make"] = title_split[1]
-                            cars_dict["Model"] = title_split[2]
-                            
-                            # Extract numeric price
-                            try:
-                                cars_dict["Price"] = int(re.sub(r'[^\d.]', '', price_text))
-                            except ValueError:
-                                # Use 0 if price can't be parsed
-                                cars_dict["Price"] = 0
-                            
-                            # Extract numeric mileage
-                            mileage_match = re.search(r'(\d+)K\s*km', mileage_text)
-                            if mileage_match:
-                                cars_dict["Mileage"] = int(mileage_match.group(1)) * 1000
-                            else:
-                                # Try different format
-                                mileage_match = re.search(r'(\d+(?:,\d+)*)\s*km', mileage_text)
-                                if mileage_match:
-                                    cars_dict["Mileage"] = int(mileage_match.group(1).replace(',', ''))
-                                else:
-                                    cars_dict["Mileage"] = 0
-                            
-                            cars_dict["URL"] = url_text if url_text.startswith('http') else f"https://www.facebook.com{url_text}"
-                            
-                            # Add to list
-                            vehicles_list.append(cars_dict)
-                        except Exception as e:
-                            print(f"Error processing listing container: {e}")
-                            continue
+                    if html_content:
+                        self._process_html_listings(html_content, ('div.x1gslohp',), vehicles_list)
                     
                     if vehicles_list:
                         self.listings = vehicles_list
@@ -344,12 +486,9 @@ class FacebookMarketplaceScraper:
             # Wait for page to load
             time.sleep(5)
             
-            # Always save HTML for debugging regardless of debug flag
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            debug_file = os.path.join(self.output_dir, f"marketplace_html_{timestamp}.html")
-            with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write(self.browser.html)
-            print(f"HTML content saved to {debug_file}")
+            # Save HTML for debugging if needed
+            if self.debug:
+                self._save_debug_html("marketplace_html", timestamp, self.browser.html)
             
             # Check if login is required
             if "Log in to Facebook" in self.browser.html or "Log Into Facebook" in self.browser.html:
@@ -358,11 +497,8 @@ class FacebookMarketplaceScraper:
                 time.sleep(60)  # Wait for manual login
                 
                 # Save HTML after login attempt
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                debug_file = os.path.join(self.output_dir, f"marketplace_html_after_login_{timestamp}.html")
-                with open(debug_file, 'w', encoding='utf-8') as f:
-                    f.write(self.browser.html)
-                print(f"HTML content after login saved to {debug_file}")
+                if self.debug:
+                    self._save_debug_html("marketplace_html_after_login", timestamp, self.browser.html)
             
             # Close any popups that might appear
             if self.browser.is_element_present_by_css('div[aria-label="Close"]', wait_time=10):
@@ -370,165 +506,347 @@ class FacebookMarketplaceScraper:
                 print("Closed popup")
             
             # Scroll down to load more results
-            print(f"Scrolling {scroll_count} times with {scroll_delay} second delay")
+            print(f"Scrolling {scroll_count} times with up to {scroll_delay} second delay")
+            driver = self.browser.driver
             for i in range(scroll_count):
+                prev_count = len(driver.find_elements(By.CSS_SELECTOR, 'div[role="article"]'))
+                
                 # Execute JavaScript to scroll to the bottom of the page
                 self.browser.execute_script("window.scrollTo(0, document.body.scrollHeight);")
                 
-                # Pause for a moment to allow the content to load
-                time.sleep(scroll_delay)
+                # Continue as soon as new listings appear, waiting at most scroll_delay seconds
+                try:
+                    WebDriverWait(driver, scroll_delay).until(
+                        lambda d: len(d.find_elements(By.CSS_SELECTOR, 'div[role="article"]')) > prev_count
+                    )
+                except TimeoutException:
+                    # Nothing new loaded within scroll_delay, same as the old fixed sleep
+                    pass
                 print(f"Scroll {i+1}/{scroll_count} completed")
             
             # Get the HTML content
             html = self.browser.html
             
             # Save HTML after scrolling
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            debug_file = os.path.join(self.output_dir, f"marketplace_html_after_scrolling_{timestamp}.html")
-            with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write(html)
-            print(f"HTML content after scrolling saved to {debug_file}")
+            if self.debug:
+                self._save_debug_html("marketplace_html_after_scrolling", timestamp, html)
             
-            # Parse the HTML
-            market_soup = soup(html, 'html.parser')
+            vehicles_list = self._extract_listings(html)
             
-            # Extract data directly from the HTML using a more robust approach
-            print("Extracting data from HTML...")
-            vehicles_list = []
+            self.listings = vehicles_list
+            return vehicles_list
             
-            # Look for all script tags containing JSON data
-            json_data_found = False
-            script_tags = market_soup.find_all('script', {'type': 'application/json'})
+        except Exception as e:
+            print(f"Error scraping listings: {e}")
+            import traceback
+            traceback.print_exc()
+            return self._get_sample_data()
+    
+    async def scrape_many(self, urls, scroll_count=4, scroll_delay=2, concurrency=3):
+        """
+        Scrape several search URLs concurrently
+        
+        Locally a single headless Chromium (Playwright) is shared by all URLs, each one getting
+        its own browser context (set CHROME_CDP_URL to use an already running browser instead);
+        in cloud environments the pages are fetched through Browserless.
+        At most `concurrency` pages load at a time.
+        
+        Args:
+            urls (list): Search URLs
+            scroll_count (int): Number of times to scroll each page
+            scroll_delay (int): Maximum delay between scrolls in seconds
+            concurrency (int): Maximum number of pages scraped at once
             
-            for script in script_tags:
-                if not script.string:
-                    continue
+        Returns:
+            list: List of dictionaries containing listing data from all URLs
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        # Cloud environments have no local Chromium, so fetch the pages through Browserless instead
+        is_cloud = os.environ.get('RENDER', False) or os.environ.get('DYNO', False)
+        if is_cloud:
+            results = await self._scrape_many_browserless(urls, scroll_count, scroll_delay, concurrency)
+        else:
+            results = await self._scrape_many_playwright(urls, scroll_count, scroll_delay, concurrency, timestamp)
+        
+        vehicles_list = []
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                print(f"Error scraping {url}: {result}")
+                continue
+            vehicles_list.extend(result)
+        
+        print(f"Extracted {len(vehicles_list)} listings from {len(urls)} searches")
+        self.listings = vehicles_list
+        return vehicles_list
+    
+    async def _scrape_many_browserless(self, urls, scroll_count, scroll_delay, concurrency):
+        """
+        Fetch and parse several search pages concurrently through Browserless.io
+        
+        Returns:
+            list: Listings (or the exception raised) for each URL, in order
+        """
+        try:
+            browserless = get_shared_client()
+        except ValueError as e:
+            # No API key; fall back to sample data like scrape_listings does (once, not per URL)
+            print(f"Error using Browserless: {e}")
+            return [self._get_sample_data()] + [[] for _ in urls[1:]]
+        
+        pages = await browserless.scrape_pages(
+            urls,
+            selector=".x1gslohp",  # Wait for marketplace listings container
+            scroll_count=scroll_count,
+            scroll_delay=scroll_delay,
+            max_concurrency=concurrency
+        )
+        
+        # Parsing is CPU-bound, so run it in worker threads
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(
+            *(
+                loop.run_in_executor(None, self._extract_listings, html) if html
+                else asyncio.sleep(0, result=[])
+                for html in pages
+            ),
+            return_exceptions=True
+        )
+    
+    async def _scrape_many_playwright(self, urls, scroll_count, scroll_delay, concurrency, timestamp):
+        """
+        Load and parse several search pages concurrently in a local headless Chromium
+        
+        Returns:
+            list: Listings (or the exception raised) for each URL, in order
+        """
+        from playwright.async_api import async_playwright
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async with async_playwright() as p:
+            # A long-lived external browser (e.g. Browserless) can be reused over CDP
+            endpoint = os.environ.get('CHROME_CDP_URL')
+            if endpoint:
+                browser = await p.chromium.connect_over_cdp(endpoint)
+            else:
+                browser = await p.chromium.launch(headless=self.headless)
+            
+            try:
+                results = await asyncio.gather(
+                    *(
+                        self._scrape_page_async(browser, semaphore, url, scroll_count, scroll_delay, f"{timestamp}_{i}")
+                        for i, url in enumerate(urls)
+                    ),
+                    return_exceptions=True
+                )
+            finally:
+                # For a CDP connection this only disconnects, leaving the external browser running
+                await browser.close()
+        
+        return results
+    
+    async def _scrape_page_async(self, browser, semaphore, url, scroll_count, scroll_delay, timestamp):
+        """
+        Load, scroll and parse a single search page for scrape_many
+        
+        Args:
+            browser: Playwright browser to open the page in
+            semaphore (asyncio.Semaphore): Limits the number of pages loading at once
+            url (str): Search URL
+            scroll_count (int): Number of times to scroll the page
+            scroll_delay (int): Maximum delay between scrolls in seconds
+            timestamp (str): Timestamp used for debug snapshots
+            
+        Returns:
+            list: List of dictionaries containing listing data
+        """
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+        
+        # Reuse cookies from earlier runs so Facebook's interstitials are skipped
+        state_file = os.path.join(self.output_dir, 'fb_state.json')
+        
+        async with semaphore:
+            context = await browser.new_context(
+                storage_state=state_file if os.path.exists(state_file) else None
+            )
+            try:
+                await context.route('**/*', _block_heavy_resources)
+                page = await context.new_page()
+                print(f"Visiting {url}")
+                await page.goto(url, wait_until='domcontentloaded')
                 
+                # Wait for the first listings, but don't fail if the layout differs
                 try:
-                    # Look for marketplace listings in the JSON data
-                    if "marketplace_listing_title" in script.string or "custom_title" in script.string:
-                        json_data_found = True
-                        # Extract the JSON data
-                        data = json.loads(script.string)
-                        
-                        # Process the JSON data to find listings
-                        self._process_json_data(data, vehicles_list)
-                except Exception as e:
-                    print(f"Error processing JSON data: {e}")
-                    continue
+                    await page.wait_for_selector('div[role="article"]', timeout=5000)
+                except PlaywrightTimeoutError:
+                    pass
+                
+                for i in range(scroll_count):
+                    prev_count = await page.locator('div[role="article"]').count()
+                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                    
+                    # Continue as soon as new listings appear, waiting at most scroll_delay seconds
+                    try:
+                        await page.wait_for_function(
+                            "prev => document.querySelectorAll('div[role=\"article\"]').length > prev",
+                            arg=prev_count,
+                            timeout=scroll_delay * 1000
+                        )
+                    except PlaywrightTimeoutError:
+                        pass
+                
+                html = await page.content()
+                
+                # Pages run concurrently, so write to a private temp file and swap it in atomically
+                tmp_state_file = f"{state_file}.{os.getpid()}.{id(context)}.tmp"
+                await context.storage_state(path=tmp_state_file)
+                os.replace(tmp_state_file, state_file)
+            finally:
+                await context.close()
+        
+        if self.debug:
+            self._save_debug_html("marketplace_html_after_scrolling", timestamp, html)
+        
+        # Parsing is CPU-bound, so run it in a worker thread and let the other pages keep loading
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._extract_listings, html)
+    
+    def _extract_listings(self, html):
+        """
+        Extract listings from the HTML of a fully loaded search page
+        
+        Tries the embedded JSON first, then the page markup itself.
+        
+        Args:
+            html (str): HTML content of the search page
+        
+        Returns:
+            list: List of dictionaries containing listing data
+        """
+        # Parse only the JSON script tags; the HTML fallback below parses the full page itself
+        market_soup = soup(html, 'lxml', parse_only=self.only_json_scripts)
+        
+        # Extract data directly from the HTML using a more robust approach
+        print("Extracting data from HTML...")
+        vehicles_list = []
+        
+        # Keep only scripts that mention listings; a cheap substring check so the rest never reach the decoder.
+        # script.string is a bs4 str subclass, which orjson rejects, so convert it to a plain str
+        script_texts = [
+            str(script.string) for script in market_soup.find_all('script')
+            if script.string and ("marketplace_listing_title" in script.string or "custom_title" in script.string)
+        ]
+        json_data_found = bool(script_texts)
+        
+        if len(script_texts) > 1:
+            # Decoding and walking each payload is CPU-bound and independent, so spread it over processes
+            for listings in _get_parse_pool().map(_parse_script, script_texts, chunksize=1):
+                vehicles_list.extend(listings)
+        elif script_texts:
+            vehicles_list.extend(_parse_script(script_texts[0]))
+        
+        if json_data_found:
+            print(f"Extracted {len(vehicles_list)} listings from JSON data")
+        else:
+            print("No JSON data found with listings")
             
-            if json_data_found:
-                print(f"Extracted {len(vehicles_list)} listings from JSON data")
-            else:
-                print("No JSON data found with listings")
+            # Fallback to direct HTML parsing if JSON approach fails
+            print("Trying direct HTML parsing...")
+            
+            # Look for common listing container patterns in Facebook's HTML
+            self._process_html_listings(
+                html, ('div[role="article"]', 'div[class*="x1qjc9v5"]'), vehicles_list
+            )
+            
+            print(f"Extracted {len(vehicles_list)} listings from HTML")
+        
+        return vehicles_list
+    
+    def _process_html_listings(self, html, container_selectors, vehicles_list):
+        """
+        Extract listings directly from Facebook Marketplace HTML
+        
+        Args:
+            html (str): HTML content of the search page
+            container_selectors (tuple): CSS selectors for listing containers, tried in order
+            vehicles_list (list): List to append vehicle data to
+            
+        Returns:
+            None (modifies vehicles_list in place)
+        """
+        # Styles, scripts and icons make up most of the page, drop them before building the tree
+        tree = LexborHTMLParser(_NOISE_RE.sub('', html))
+        
+        # Use the first selector that matches anything
+        listing_containers = []
+        for selector in container_selectors:
+            listing_containers = tree.css(selector)
+            if listing_containers:
+                break
+        
+        print(f"Found {len(listing_containers)} potential listing containers")
+        
+        for container in listing_containers:
+            try:
+                # Classify the spans in a single pass, stopping once title, price and mileage are found
+                title_text = price_text = mileage_text = None
+                for span in container.css('span'):
+                    text = span.text()
+                    if not text:
+                        continue
+                    
+                    if title_text is None:
+                        # Only the first three words matter, so stop splitting after them
+                        words = text.split(None, 2)
+                        if len(words) >= 3 and words[0].isdigit():
+                            title_text = text.strip()
+                    if price_text is None and '$' in text:
+                        price_text = text.strip()
+                    if mileage_text is None and 'km' in text.lower():
+                        mileage_text = text.strip()
+                    
+                    if title_text and price_text and mileage_text:
+                        break
                 
-                # Fallback to direct HTML parsing if JSON approach fails
-                print("Trying direct HTML parsing...")
+                if not title_text or not price_text:
+                    continue
                 
-                # Find all listing containers - looking for common patterns in Facebook's HTML
-                listing_containers = market_soup.find_all('div', {'role': 'article'})
-                if not listing_containers:
-                    # Try alternative selectors
-                    listing_containers = market_soup.find_all('div', class_=lambda c: c and "x1qjc9v5" in c)
+                # Look for URL
+                url_elem = container.css_first('a[href]')
+                if not url_elem:
+                    continue
+                url_text = url_elem.attributes.get('href') or ''
                 
-                print(f"Found {len(listing_containers)} potential listing containers")
+                # Skip if title doesn't start with year, make and model
+                title_parts = _parse_title(title_text)
+                if not title_parts:
+                    continue
                 
-                for container in listing_containers:
-                    try:
-                        # Look for title elements
-                        title_elem = None
-                        for span in container.find_all('span'):
-                            if span.text and len(span.text.split()) >= 3 and span.text.split()[0].isdigit():
-                                title_elem = span
-                                break
-                        
-                        if not title_elem:
-                            continue
-                        
-                        # Look for price elements
-                        price_elem = None
-                        for span in container.find_all('span'):
-                            if span.text and '$' in span.text:
-                                price_elem = span
-                                break
-                        
-                        if not price_elem:
-                            continue
-                        
-                        # Look for URL
-                        url_elem = container.find('a', href=True)
-                        if not url_elem:
-                            continue
-                        
-                        # Process the data
-                        title_text = title_elem.text.strip()
-                        price_text = price_elem.text.strip()
-                        url_text = url_elem.get('href')
-                        
-                        # Extract mileage from any span that mentions km
-                        mileage_text = "0 km"
-                        for span in container.find_all('span'):
-                            if span.text and 'km' in span.text.lower():
-                                mileage_text = span.text.strip()
-                                break
-                        
-                        # Create car dictionary
-                        cars_dict = {}
-                        title_split = title_text.split()
-                        
-                        # Skip if title doesn't have at least 3 parts (year, make, model)
-                        if len(title_split) < 3:
-                            continue
-                        
-                        # Try to parse year as integer
-                        try:
-                            cars_dict["Year"] = int(title_split[0])
-                        except ValueError:
-                            # Skip if year is not a valid integer
-                            continue
-                        
-                        cars_dict["Make"] = title_split[1]
-                        cars_dict["Model"] = title_split[2]
-                        
-                        # Extract numeric price
-                        try:
-                            cars_dict["Price"] = int(re.sub(r'[^\d.]', '', price_text))
-                        except ValueError:
-                            # Use 0 if price can't be parsed
-                            cars_dict["Price"] = 0
-                        
-                        # Extract numeric mileage
-                        mileage_match = re.search(r'(\d+)K\s*km', mileage_text)
-                        if mileage_match:
-                            cars_dict["Mileage"] = int(mileage_match.group(1)) * 1000
-                        else:
-                            # Try different format
-                            mileage_match = re.search(r'(\d+(?:,\d+)*)\s*km', mileage_text)
-                            if mileage_match:
-                                cars_dict["Mileage"] = int(mileage_match.group(1).replace(',', ''))
-                            else:
-                                cars_dict["Mileage"] = 0
-                        
-                        cars_dict["URL"] = url_text if url_text.startswith('http') else f"https://www.facebook.com{url_text}"
-                        
-                        # Add to list
-                        vehicles_list.append(cars_dict)
-                    except Exception as e:
-                        print(f"Error processing listing container: {e}")
-                        continue
+                # Create car dictionary
+                cars_dict = {}
+                cars_dict["Year"], cars_dict["Make"], cars_dict["Model"] = title_parts
                 
-                print(f"Extracted {len(vehicles_list)} listings from HTML")
-            
-            self.listings = vehicles_list
-            return vehicles_list
-            
-        except Exception as e:
-            print(f"Error scraping listings: {e}")
-            import traceback
-            traceback.print_exc()
-            return self._get_sample_data()
+                # Extract numeric price
+                try:
+                    cars_dict["Price"] = int(_PRICE_STRIP_RE.sub('', price_text))
+                except ValueError:
+                    # Use 0 if price can't be parsed
+                    cars_dict["Price"] = 0
+                
+                # Extract numeric mileage, defaulting to 0 when no span mentions km
+                cars_dict["Mileage"] = _parse_mileage(mileage_text) if mileage_text else 0
+                
+                cars_dict["URL"] = url_text if url_text.startswith('http') else f"https://www.facebook.com{url_text}"
+                
+                # Add to list
+                vehicles_list.append(cars_dict)
+            except Exception as e:
+                print(f"Error processing listing container: {e}")
+                continue
     
-    def _process_json_data(self, json_data, vehicles_list):
+    @staticmethod
+    def _process_json_data(json_data, vehicles_list):
         """
         Process JSON data extracted from Facebook Marketplace
         
@@ -569,6 +887,10 @@ class FacebookMarketplaceScraper:
                             listings = value
                             break
             
+            # As a last resort walk the whole payload, listings are usually nested deep inside it
+            if not listings:
+                listings = _find_listing_nodes(json_data)
+            
             if not listings or not isinstance(listings, list):
                 print("Could not find listings in JSON data")
                 return
@@ -594,16 +916,20 @@ class FacebookMarketplaceScraper:
                     if not title:
                         continue
                     
-                    # Extract price
+                    # Extract price (GraphQL listing nodes carry it as listing_price)
                     price = 0
-                    if 'price' in listing_data:
-                        price_text = listing_data['price']
+                    price_text = listing_data.get('price') or listing_data.get('listing_price')
+                    if price_text:
                         if isinstance(price_text, dict) and 'amount' in price_text:
-                            price = price_text['amount']
+                            # Amounts come through as strings such as "15000.00"
+                            try:
+                                price = int(float(price_text['amount']))
+                            except (TypeError, ValueError):
+                                price = 0
                         elif isinstance(price_text, str):
                             # Extract numeric price
                             try:
-                                price = int(re.sub(r'[^\d.]', '', price_text))
+                                price = int(_PRICE_STRIP_RE.sub('', price_text))
                             except ValueError:
                                 price = 0
                     
@@ -613,6 +939,9 @@ class FacebookMarketplaceScraper:
                         url = listing_data['url']
                     elif 'marketplace_listing_url' in listing_data:
                         url = listing_data['marketplace_listing_url']
+                    elif listing_data.get('id'):
+                        # GraphQL listing nodes only carry the listing id
+                        url = f"/marketplace/item/{listing_data['id']}/"
                     
                     if not url:
                         continue
@@ -622,25 +951,20 @@ class FacebookMarketplaceScraper:
                         url = f"https://www.facebook.com{url}"
                     
                     # Try to parse the title to extract year, make, model
-                    title_parts = title.split()
-                    if len(title_parts) < 3:
+                    title_parts = _parse_title(title)
+                    if not title_parts:
                         continue
+                    year, make, model = title_parts
                     
-                    # Try to parse year
-                    try:
-                        year = int(title_parts[0])
-                        # Skip if year is not realistic
-                        if year < 1900 or year > 2030:
-                            continue
-                    except ValueError:
-                        # Skip if year is not a valid integer
+                    # Skip if year is not realistic
+                    if year < 1900 or year > 2030:
                         continue
                     
                     # Create car dictionary
                     car_dict = {
                         "Year": year,
-                        "Make": title_parts[1],
-                        "Model": title_parts[2],
+                        "Make": make,
+                        "Model": model,
                         "Price": price,
                         "URL": url,
                         "Mileage": 0  # Default mileage
@@ -653,14 +977,9 @@ class FacebookMarketplaceScraper:
                                 badge_text = badge['text']
                                 if 'km' in badge_text.lower():
                                     # Extract numeric mileage
-                                    mileage_match = re.search(r'(\d+)K\s*km', badge_text)
-                                    if mileage_match:
-                                        car_dict["Mileage"] = int(mileage_match.group(1)) * 1000
-                                    else:
-                                        # Try different format
-                                        mileage_match = re.search(r'(\d+(?:,\d+)*)\s*km', badge_text)
-                                        if mileage_match:
-                                            car_dict["Mileage"] = int(mileage_match.group(1).replace(',', ''))
+                                    mileage = _parse_mileage(badge_text)
+                                    if mileage:
+                                        car_dict["Mileage"] = mileage
                     
                     # Add to list
                     vehicles_list.append(car_dict)
@@ -680,54 +999,8 @@ class FacebookMarketplaceScraper:
             list: List of dictionaries containing sample car data
         """
         print("Generating sample car data instead of scraping")
-        sample_data = [
-            {
-                "Year": 2018, 
-                "Make": "Honda", 
-                "Model": "Civic", 
-                "Price": 15995, 
-                "Mileage": 78500, 
-                "URL": "https://www.facebook.com/marketplace/item/sample1",
-                "ImageURL": "https://upload.wikimedia.org/wikipedia/commons/thumb/5/57/2018_Honda_Civic_SE_1.4_Front.jpg/1200px-2018_Honda_Civic_SE_1.4_Front.jpg"
-            },
-            {
-                "Year": 2017, 
-                "Make": "Toyota", 
-                "Model": "Corolla", 
-                "Price": 14500, 
-                "Mileage": 65000, 
-                "URL": "https://www.facebook.com/marketplace/item/sample2",
-                "ImageURL": "https://upload.wikimedia.org/wikipedia/commons/thumb/f/f6/2017_Toyota_Corolla_%28ZRE172R%29_Ascent_sedan_%282018-11-02%29_01.jpg/1200px-2017_Toyota_Corolla_%28ZRE172R%29_Ascent_sedan_%282018-11-02%29_01.jpg"
-            },
-            {
-                "Year": 2019, 
-                "Make": "Mazda", 
-                "Model": "3", 
-                "Price": 17995, 
-                "Mileage": 45000, 
-                "URL": "https://www.facebook.com/marketplace/item/sample3",
-                "ImageURL": "https://upload.wikimedia.org/wikipedia/commons/thumb/8/8c/2019_Mazda3_Sport_2.5L_AWD_%28North_America%29_front_NYIAS_2019.jpg/1200px-2019_Mazda3_Sport_2.5L_AWD_%28North_America%29_front_NYIAS_2019.jpg"
-            },
-            {
-                "Year": 2016, 
-                "Make": "Hyundai", 
-                "Model": "Elantra", 
-                "Price": 12500, 
-                "Mileage": 89000, 
-                "URL": "https://www.facebook.com/marketplace/item/sample4",
-                "ImageURL": "https://upload.wikimedia.org/wikipedia/commons/thumb/c/c5/2016_Hyundai_Elantra_%28AD%29_Elite_sedan_%282018-11-02%29_01.jpg/1200px-2016_Hyundai_Elantra_%28AD%29_Elite_sedan_%282018-11-02%29_01.jpg"
-            },
-            {
-                "Year": 2020, 
-                "Make": "Nissan", 
-                "Model": "Sentra", 
-                "Price": 18995, 
-                "Mileage": 32000, 
-                "URL": "https://www.facebook.com/marketplace/item/sample5",
-                "ImageURL": "https://upload.wikimedia.org/wikipedia/commons/thumb/f/fd/2020_Nissan_Sentra_SR%2C_front_12.21.19.jpg/1200px-2020_Nissan_Sentra_SR%2C_front_12.21.19.jpg"
-            }
-        ]
-        return sample_data
+        # Shallow copies so callers can modify the listings freely
+        return [dict(listing) for listing in _SAMPLE_DATA]
     
     def save_to_csv(self, filename=None):
         """
@@ -748,11 +1021,12 @@ class FacebookMarketplaceScraper:
             filename = os.path.join(self.output_dir, f"marketplace_listings_{timestamp}.csv")
         
         try:
-            # Convert to DataFrame
-            df = pd.DataFrame(self.listings)
-            
-            # Save to CSV
-            df.to_csv(filename, index=False)
+            # Flatten each listing to a tuple once, then stream them through one large buffer
+            rows = [tuple(listing.get(field, '') for field in _CSV_FIELDS) for listing in self.listings]
+            with open(filename, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+                writer = csv.writer(f)
+                writer.writerow(_CSV_FIELDS)
+                writer.writerows(rows)
             print(f"Saved {len(self.listings)} listings to {filename}")
             
             return filename
@@ -780,22 +1054,34 @@ class FacebookMarketplaceScraper:
             return None
         
         try:
+            # Imported here so scrape-only runs don't pay for pandas and matplotlib
+            import pandas as pd
+            import matplotlib
+            
+            # Plots are only ever written to files, so skip the interactive GUI backend
+            matplotlib.use('Agg')
+            import matplotlib.pyplot as plt
+            
             # Convert to DataFrame
             df = pd.DataFrame(self.listings)
             
-            # Create figure
-            plt.figure(figsize=(10, 6))
+            # Create the figure once and clear it on later calls
+            if self._fig is None:
+                self._fig, self._ax = plt.subplots(figsize=(10, 6))
+            else:
+                self._ax.clear()
+            ax = self._ax
             
             # Create scatter plot
-            plt.scatter(df[x_column], df[y_column], alpha=0.7)
+            ax.scatter(df[x_column], df[y_column], alpha=0.7)
             
             # Add title and labels
-            plt.title(f'{y_column} vs {x_column}')
-            plt.xlabel(x_column)
-            plt.ylabel(y_column)
+            ax.set_title(f'{y_column} vs {x_column}')
+            ax.set_xlabel(x_column)
+            ax.set_ylabel(y_column)
             
             # Add grid
-            plt.grid(True, linestyle='--', alpha=0.7)
+            ax.grid(True, linestyle='--', alpha=0.7)
             
             # Generate output filename if not provided
             if not output_file:
@@ -803,12 +1089,9 @@ class FacebookMarketplaceScraper:
                 output_file = os.path.join(self.output_dir, f"marketplace_plot_{x_column}_vs_{y_column}_{timestamp}.png")
             
             # Save plot
-            plt.savefig(output_file)
+            self._fig.savefig(output_file)
             print(f"Plot saved to {output_file}")
             
-            # Close the plot to free memory
-            plt.close()
-            
             return output_file
             
         except Exception as e:
@@ -829,23 +1112,37 @@ class FacebookMarketplaceScraper:
         print(f"SUMMARY: Found {len(self.listings)} listings")
         print(f"{'='*50}")
         
+        import numpy as np
+        
+        # Gather the numeric columns in a single pass; missing values become 0 and are ignored
+        prices, mileages, years = np.array(
+            [
+                (listing.get('Price') or 0, listing.get('Mileage') or 0, listing.get('Year') or 0)
+                for listing in self.listings
+            ],
+            dtype=np.float64
+        ).T
+        
         # Calculate price statistics
-        prices = [listing.get('Price') for listing in self.listings if listing.get('Price')]
-        if prices:
-            print(f"Price Range: ${min(prices):.2f} - ${max(prices):.2f}")
-            print(f"Average Price: ${sum(prices)/len(prices):.2f}")
+        price_stats = _column_stats(prices)
+        if price_stats:
+            low, high, mean = price_stats
+            print(f"Price Range: ${low:.2f} - ${high:.2f}")
+            print(f"Average Price: ${mean:.2f}")
         
         # Calculate mileage statistics
-        mileages = [listing.get('Mileage') for listing in self.listings if listing.get('Mileage')]
-        if mileages:
-            print(f"Mileage Range: {min(mileages):,} - {max(mileages):,} km")
-            print(f"Average Mileage: {sum(mileages)/len(mileages):,.2f} km")
+        mileage_stats = _column_stats(mileages)
+        if mileage_stats:
+            low, high, mean = mileage_stats
+            print(f"Mileage Range: {int(low):,} - {int(high):,} km")
+            print(f"Average Mileage: {mean:,.2f} km")
         
         # Calculate year statistics
-        years = [listing.get('Year') for listing in self.listings if listing.get('Year')]
-        if years:
-            print(f"Year Range: {min(years)} - {max(years)}")
-            print(f"Average Year: {sum(years)/len(years):.2f}")
+        year_stats = _column_stats(years)
+        if year_stats:
+            low, high, mean = year_stats
+            print(f"Year Range: {int(low)} - {int(high)}")
+            print(f"Average Year: {mean:.2f}")
         
         # Print the first few listings
         print("\nSample Listings:")
@@ -858,6 +1155,27 @@ class FacebookMarketplaceScraper:
             print(f"\n... and {len(self.listings) - 5} more listings")
 
 
+def _parse_script(script_text):
+    """
+    Decode one listing script and extract its listings
+    
+    Module-level so it can run in a ProcessPoolExecutor worker.
+    
+    Args:
+        script_text (str): JSON text of a <script type="application/json"> tag (a plain str;
+                           orjson rejects str subclasses such as bs4's NavigableString)
+        
+    Returns:
+        list: List of dictionaries containing listing data
+    """
+    vehicles_list = []
+    try:
+        FacebookMarketplaceScraper._process_json_data(orjson.loads(script_text), vehicles_list)
+    except Exception as e:
+        print(f"Error processing JSON data: {e}")
+    return vehicles_list
+
+
 def main():
     parser = argparse.ArgumentParser(description="Facebook Marketplace Scraper")
     parser.add_argument("--location", required=True, help="Location to search in (e.g., 'toronto', 'calgary')")
@@ -869,14 +1187,15 @@ def main():
     parser.add_argument("--min-year", type=int, help="Minimum year")
     parser.add_argument("--max-year", type=int, help="Maximum year")
     parser.add_argument("--transmission", choices=["automatic", "manual"], help="Transmission type")
-    parser.add_argument("--make", help="Vehicle make (e.g., 'Honda')")
-    parser.add_argument("--model", help="Vehicle model (e.g., 'Civic')")
+    parser.add_argument("--make", action="append", help="Vehicle make (e.g., 'Honda'); repeat with --model to run several searches")
+    parser.add_argument("--model", action="append", help="Vehicle model (e.g., 'Civic'); paired with --make in order")
     parser.add_argument("--output", help="Output CSV filename")
     parser.add_argument("--plot", action="store_true", help="Create a scatter plot of year vs price")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
     parser.add_argument("--visible", action="store_true", help="Make browser visible (non-headless)")
     parser.add_argument("--scroll-count", type=int, default=4, help="Number of times to scroll the page")
     parser.add_argument("--scroll-delay", type=int, default=2, help="Delay between scrolls in seconds")
+    parser.add_argument("--concurrency", type=int, default=3, help="Searches scraped at once when several --make/--model pairs are given")
     
     args = parser.parse_args()
     
@@ -884,23 +1203,32 @@ def main():
     scraper = FacebookMarketplaceScraper(headless=not args.visible, debug=args.debug)
     
     try:
-        # Build search URL
-        url = scraper.build_search_url(
-            location=args.location,
-            min_price=args.min_price,
-            max_price=args.max_price,
-            days_listed=args.days_listed,
-            min_mileage=args.min_mileage,
-            max_mileage=args.max_mileage,
-            min_year=args.min_year,
-            max_year=args.max_year,
-            transmission=args.transmission,
-            make=args.make,
-            model=args.model
-        )
+        # Build one search URL per make/model pair
+        pairs = list(zip_longest(args.make or [None], args.model or [None]))
+        urls = [
+            scraper.build_search_url(
+                location=args.location,
+                min_price=args.min_price,
+                max_price=args.max_price,
+                days_listed=args.days_listed,
+                min_mileage=args.min_mileage,
+                max_mileage=args.max_mileage,
+                min_year=args.min_year,
+                max_year=args.max_year,
+                transmission=args.transmission,
+                make=make,
+                model=model
+            )
+            for make, model in pairs
+        ]
         
-        # Scrape listings
-        listings = scraper.scrape_listings(url, args.scroll_count, args.scroll_delay)
+        # Scrape listings, running several searches concurrently when requested
+        if len(urls) > 1:
+            listings = asyncio.run(
+                scraper.scrape_many(urls, args.scroll_count, args.scroll_delay, args.concurrency)
+            )
+        else:
+            listings = scraper.scrape_listings(urls[0], args.scroll_count, args.scroll_delay)
         
         if listings:
             # Print summary
@@ -937,6 +1265,8 @@ if __name__ == "__main__":
         print("  python Facebook_Marketplace_Scraper.py --location toronto --min-price 1000 --max-price 30000 --make Honda --model Civic")
         print("\n  # Search for cars from 2010-2020 with automatic transmission")
         print("  python Facebook_Marketplace_Scraper.py --location calgary --min-year 2010 --max-year 2020 --transmission automatic")
+        print("\n  # Search for Honda Civics and Toyota Corollas concurrently")
+        print("  python Facebook_Marketplace_Scraper.py --location toronto --make Honda --model Civic --make Toyota --model Corolla")
         print("\n  # Search with visible browser and create a plot")
         print("  python Facebook_Marketplace_Scraper.py --location vancouver --make Toyota --visible --plot")
         print("\nFor more options, use --help")
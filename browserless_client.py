@@ -4,31 +4,371 @@ This module provides a wrapper around the Browserless.io API to perform browser
 in the cloud, which is more reliable for deployment environments like Render.
 """
 
+import atexit
 import os
-import json
+import queue
+import threading
 import time
 import asyncio
+import aiohttp
+import orjson
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 import re
-from pyppeteer.errors import TimeoutError
+from urllib.parse import parse_qsl, urlencode
+
+# Recycle a pooled browser profile after this many scrapes so it doesn't grow stale
+MAX_USES_PER_INSTANCE = 50
+
+# Browser profile slots per API key, shared by every client in the process so concurrent
+# scrapes (e.g. several Streamlit sessions) never run in the same profile at once
+_profile_pools = {}
+_profile_pools_lock = threading.Lock()
+
+# Client shared by every scrape in the process, so its connection pool is actually reused
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+# Request bodies are serialised with orjson, so the Content-Type has to be set by hand
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Marker that only appears in the script holding the marketplace search results
+_MP_TOKEN = 'marketplace_search_feed_cards_feedback_actions_renderer'
+
+# Greedy object match; deliberately without DOTALL, since it runs on single lines and spanning
+# newlines would only let it swallow neighbouring objects into one undecodable candidate
+_JSON_RE = re.compile(r'\{.*\}')
+
+
+# Browserless functions, kept as module constants and pre-serialised once for the request envelope
+_SCRAPE_FN = """
+async ({ page, context, timeout = 10000 }) => {
+    // Set a generous timeout
+    await page.setDefaultNavigationTimeout(timeout);
+    
+    // Navigate to the URL
+    await page.goto(context.url, { waitUntil: 'networkidle2' });
+    
+    // Wait for specific selector if provided
+    if (context.selector) {
+        try {
+            await page.waitForSelector(context.selector, { timeout });
+        } catch (e) {
+            console.log(`Selector ${context.selector} not found, continuing anyway`);
+        }
+    }
+    
+    // Wait additional time if specified
+    if (context.wait) {
+        await new Promise(resolve => setTimeout(resolve, context.wait));
+    }
+    
+    // Only Marketplace feed queries, not presence/notification traffic on the same endpoint
+    const isFeedResponse = r => {
+        const request = r.request();
+        const name = request.headers()['x-fb-friendly-name'] || request.postData() || '';
+        return r.url().includes('/api/graphql/') && r.status() === 200 && name.includes('Marketplace');
+    };
+    
+    // Scroll the page if requested, moving on as soon as the next batch of results has rendered
+    let prevHeight = await page.evaluate(() => document.body.scrollHeight);
+    for (let i = 0; i < context.scrollCount; i++) {
+        const deadline = Date.now() + context.scrollDelay * 1000;
+        const nextBatch = page.waitForResponse(isFeedResponse, { timeout: context.scrollDelay * 1000 })
+            .catch(() => null);
+        await page.evaluate(() => {
+            window.scrollBy(0, window.innerHeight);
+        });
+        await nextBatch;
+        
+        // The response arrives before its listings are rendered, so wait for the page to grow
+        const grew = await page.waitForFunction(
+            prev => document.body.scrollHeight > prev,
+            { timeout: Math.max(deadline - Date.now(), 1) },
+            prevHeight
+        ).then(() => true, () => false);
+        
+        // Stop once we're at the bottom and scrolling no longer loads anything
+        const [height, atBottom] = await page.evaluate(() => [
+            document.body.scrollHeight,
+            window.scrollY + window.innerHeight >= document.body.scrollHeight - 1
+        ]);
+        if (!grew && atBottom) {
+            break;
+        }
+        prevHeight = height;
+    }
+    
+    // Return the HTML content
+    return await page.content();
+}
+"""
+_SCRAPE_FN_BYTES = orjson.dumps(_SCRAPE_FN)
+
+# Loads a search page, captures its GraphQL pagination request and extracts the embedded listing JSON
+_CAPTURE_FN = """
+async ({ page, context, timeout = 10000 }) => {
+    await page.setDefaultNavigationTimeout(timeout);
+    
+    // Remember the first Marketplace pagination query the page sends
+    let captured = null;
+    page.on('request', request => {
+        if (captured || request.method() !== 'POST' || !request.url().includes('/api/graphql/')) {
+            return;
+        }
+        const postData = request.postData() || '';
+        const headers = request.headers();
+        const name = headers['x-fb-friendly-name'] || postData;
+        if (postData.includes('cursor') && name.includes('Marketplace')) {
+            captured = { url: request.url(), headers, postData };
+        }
+    });
+    
+    await page.goto(context.url, { waitUntil: 'networkidle2' });
+    
+    if (context.selector) {
+        try {
+            await page.waitForSelector(context.selector, { timeout });
+        } catch (e) {
+            console.log(`Selector ${context.selector} not found, continuing anyway`);
+        }
+    }
+    
+    // A single scroll makes the page request its next batch of results
+    await page.evaluate(() => {
+        window.scrollBy(0, document.body.scrollHeight);
+    });
+    const deadline = Date.now() + context.captureTimeout * 1000;
+    while (!captured && Date.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, 100));
+    }
+    
+    // Same lookup as extract_json_from_html, done in the page so only the JSON is sent back
+    const json = await page.evaluate(token => {
+        for (const script of document.querySelectorAll('script')) {
+            const text = script.textContent;
+            if (!text || !text.includes(token)) {
+                continue;
+            }
+            for (const line of text.split('\\n')) {
+                const match = line.includes(token) && line.match(/\\{.*\\}/);
+                if (!match) {
+                    continue;
+                }
+                try {
+                    const data = JSON.parse(match[0]);
+                    for (const item of Array.isArray(data.require) ? data.require : []) {
+                        if (Array.isArray(item) && item.length > 2 && JSON.stringify(item).includes(token)) {
+                            return item[2];
+                        }
+                    }
+                } catch (e) {
+                    continue;
+                }
+            }
+        }
+        return null;
+    }, context.token);
+    
+    return {
+        data: {
+            json,
+            html: json && !context.includeHtml ? null : await page.content(),
+            request: captured,
+            cookies: await page.cookies()
+        },
+        type: 'application/json'
+    };
+}
+"""
+_CAPTURE_FN_BYTES = orjson.dumps(_CAPTURE_FN)
+
+
+def _function_body(function_bytes, context):
+    """Build the /function JSON body, serialising only the per-call context"""
+    return b'{"code":' + function_bytes + b',"context":' + orjson.dumps(context) + b'}'
+
+
+def _lines_containing(text, token):
+    """Yield each line of text that contains token, without splitting the whole text"""
+    idx = text.find(token)
+    while idx != -1:
+        start = text.rfind('\n', 0, idx) + 1
+        end = text.find('\n', idx)
+        if end == -1:
+            end = len(text)
+        yield text[start:end]
+        idx = text.find(token, end)
+
+
+def _has_token(data):
+    """Check whether _MP_TOKEN appears in any string (key or value) of nested JSON data"""
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, str):
+            if _MP_TOKEN in obj:
+                return True
+        elif isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+    return False
+
+
+def _decode_graphql_body(body):
+    """Decode a GraphQL response, which may hold several newline-separated JSON documents"""
+    payloads = []
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            payloads.append(orjson.loads(line))
+        except orjson.JSONDecodeError:
+            continue
+    return payloads
+
+
+def _find_page_info(data):
+    """Return the first pagination dict (one carrying 'end_cursor') found in nested JSON data"""
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            page_info = obj.get('page_info')
+            if isinstance(page_info, dict) and 'end_cursor' in page_info:
+                return page_info
+            stack.extend(obj.values())
+        elif isinstance(obj, list):
+            stack.extend(obj)
+    return None
+
+
+def _profile_pool(api_key, pool_size):
+    """
+    Return the process-wide queue of browser profile slots for an API key, creating it on first use
+    
+    Args:
+        api_key (str): Browserless API key the profiles belong to
+        pool_size (int): Number of slots to create if the pool doesn't exist yet
+        
+    Returns:
+        queue.Queue: Free slots; a slot is only in the queue while no scrape is using it
+    """
+    with _profile_pools_lock:
+        slots = _profile_pools.get(api_key)
+        if slots is None:
+            slots = queue.Queue()
+            for slot_id in range(pool_size):
+                slots.put({"id": slot_id, "generation": 0, "uses": 0})
+            _profile_pools[api_key] = slots
+        return slots
+
 
 class BrowserlessClient:
     """Client for interacting with Browserless.io API"""
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, pool_size=4, keepalive_ms=300_000):
         """
         Initialize the Browserless client
         
         Args:
             api_key (str, optional): Browserless API key. If not provided, will look for
                                     BROWSERLESS_API_KEY environment variable.
+            pool_size (int, optional): Number of warm browser profiles scrapes are spread over
+                                       (only used by the first client created for an API key)
+            keepalive_ms (int, optional): How long Browserless keeps a browser alive after a scrape
         """
         self.api_key = api_key or os.environ.get('BROWSERLESS_API_KEY')
         if not self.api_key:
             raise ValueError("Browserless API key is required. Set BROWSERLESS_API_KEY environment variable.")
         
         self.base_url = f"https://chrome.browserless.io"
+        self.keepalive_ms = keepalive_ms
+        
+        # Each slot names a persistent profile on the Browserless side, so repeat scrapes
+        # reuse a warm browser with its cookies instead of cold-starting a fresh one
+        self._slots = _profile_pool(self.api_key, pool_size)
+        
+        # Keep-alive connection pool, so repeat requests skip the TCP and TLS handshakes
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3,
+                # A read timeout may mean the function is still running; retrying it would block for
+                # another full timeout and start a second billed run, so only retry connects and statuses
+                read=0,
+                backoff_factor=0.3,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=None  # Browserless calls are POSTs, which urllib3 won't retry by default
+            )
+        )
+        self._session.mount('https://', adapter)
+    
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self._session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _release_slot(self, slot):
+        """Return a pooled profile, switching to a fresh one once it hits MAX_USES_PER_INSTANCE"""
+        slot["uses"] += 1
+        if slot["uses"] >= MAX_USES_PER_INSTANCE:
+            slot["generation"] += 1
+            slot["uses"] = 0
+        self._slots.put(slot)
+    
+    def _function_request(self, slot, url, selector=None, wait_for=None, scroll_count=0, scroll_delay=1):
+        """
+        Build the Browserless /function request for scraping a page
+        
+        Args:
+            slot (dict): Pooled browser profile to run the scrape in
+            url (str): URL to scrape
+            selector (str, optional): CSS selector to wait for before returning HTML
+            wait_for (int, optional): Time in milliseconds to wait before returning HTML
+            scroll_count (int, optional): Number of times to scroll the page
+            scroll_delay (int, optional): Delay between scrolls in seconds
+            
+        Returns:
+            tuple: (endpoint URL, JSON request body as bytes)
+        """
+        # Create the context object with parameters
+        context = {
+            "url": url,
+            "selector": selector,
+            "wait": wait_for,
+            "scrollCount": scroll_count,
+            "scrollDelay": scroll_delay
+        }
+        
+        return self._function_endpoint(slot), _function_body(_SCRAPE_FN_BYTES, context)
+    
+    def _function_endpoint(self, slot):
+        """
+        Build the Browserless /function endpoint that runs in a pooled browser profile
+        
+        Args:
+            slot (dict): Pooled browser profile to run the function in
+            
+        Returns:
+            str: Endpoint URL
+        """
+        profile_dir = f"/tmp/aicarfinder-{slot['id']}-{slot['generation']}"
+        return (
+            f"{self.base_url}/function?token={self.api_key}"
+            f"&keepalive={self.keepalive_ms}&--user-data-dir={profile_dir}"
+        )
     
     def scrape_page(self, url, selector=None, wait_for=None, scroll_count=0, scroll_delay=1):
         """
@@ -46,65 +386,177 @@ class BrowserlessClient:
         """
         print(f"Scraping {url} with Browserless.io")
         
-        # Create the function to execute in the browser
-        function = """
-        async ({ page, context, timeout = 10000 }) => {
-            // Set a generous timeout
-            await page.setDefaultNavigationTimeout(timeout);
-            
-            // Navigate to the URL
-            await page.goto(context.url, { waitUntil: 'networkidle2' });
-            
-            // Wait for specific selector if provided
-            if (context.selector) {
-                try {
-                    await page.waitForSelector(context.selector, { timeout });
-                } catch (e) {
-                    console.log(`Selector ${context.selector} not found, continuing anyway`);
-                }
-            }
+        # Make the API request in one of the pooled browser profiles
+        slot = self._slots.get()
+        try:
+            endpoint, body = self._function_request(slot, url, selector, wait_for, scroll_count, scroll_delay)
+            response = self._session.post(endpoint, data=body, headers=_JSON_HEADERS, timeout=120)
+            response.raise_for_status()
+            return response.text
+        except requests.exceptions.RequestException as e:
+            print(f"Error scraping with Browserless: {e}")
+            return None
+        finally:
+            self._release_slot(slot)
+    
+    async def scrape_pages(self, urls, selector=None, wait_for=None, scroll_count=0, scroll_delay=1, max_concurrency=5):
+        """
+        Scrape several web pages concurrently using Browserless.io
+        
+        Args:
+            urls (list): URLs to scrape
+            selector (str, optional): CSS selector to wait for before returning HTML
+            wait_for (int, optional): Time in milliseconds to wait before returning HTML
+            scroll_count (int, optional): Number of times to scroll each page
+            scroll_delay (int, optional): Delay between scrolls in seconds
+            max_concurrency (int, optional): Maximum number of pages scraped at once
             
-            // Wait additional time if specified
-            if (context.wait) {
-                await new Promise(resolve => setTimeout(resolve, context.wait));
-            }
+        Returns:
+            list: HTML content of each page in the order of urls, None where scraping failed
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        # One session for the whole batch so connections are pooled
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=120)) as session:
+            results = await asyncio.gather(
+                *(
+                    self._scrape_one(session, semaphore, url, selector, wait_for, scroll_count, scroll_delay)
+                    for url in urls
+                ),
+                return_exceptions=True
+            )
+        
+        pages = []
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                print(f"Error scraping {url} with Browserless: {result}")
+                result = None
+            pages.append(result)
+        return pages
+    
+    def scrape_pages_sync(self, urls, **kwargs):
+        """
+        Blocking wrapper around scrape_pages for callers without an event loop
+        
+        Args:
+            urls (list): URLs to scrape
+            **kwargs: Passed on to scrape_pages
             
-            // Scroll the page if requested
-            for (let i = 0; i < context.scrollCount; i++) {
-                await page.evaluate(() => {
-                    window.scrollBy(0, window.innerHeight);
-                });
-                await new Promise(resolve => setTimeout(resolve, context.scrollDelay * 1000));
-            }
+        Returns:
+            list: HTML content of each page in the order of urls, None where scraping failed
+        """
+        return asyncio.run(self.scrape_pages(urls, **kwargs))
+    
+    async def _scrape_one(self, session, semaphore, url, selector, wait_for, scroll_count, scroll_delay):
+        """Scrape a single page for scrape_pages, holding the semaphore for the duration of the request"""
+        async with semaphore:
+            # Waiting for a free profile blocks, so do it off the event loop
+            slot = await asyncio.get_running_loop().run_in_executor(None, self._slots.get)
+            try:
+                endpoint, body = self._function_request(slot, url, selector, wait_for, scroll_count, scroll_delay)
+                print(f"Scraping {url} with Browserless.io")
+                async with session.post(endpoint, data=body, headers=_JSON_HEADERS) as response:
+                    response.raise_for_status()
+                    return await response.text()
+            finally:
+                self._release_slot(slot)
+    
+    def capture_graphql(self, url, selector=None, capture_timeout=5, include_html=False):
+        """
+        Load a Marketplace search page and capture the GraphQL request it uses for the next page of results
+        
+        The embedded listing JSON is extracted inside the browser, so the page HTML only crosses
+        the wire when that extraction finds nothing (or include_html is set).
+        
+        Args:
+            url (str): Search URL
+            selector (str, optional): CSS selector to wait for before scrolling
+            capture_timeout (int, optional): Seconds to wait for the pagination request after scrolling
+            include_html (bool, optional): Always return the page HTML, e.g. for debug snapshots
             
-            // Return the HTML content
-            return await page.content();
-        }
+        Returns:
+            dict: The extracted listing 'json' (as extract_json_from_html would return it), the page
+                  'html' (None when not needed), the captured 'request' (url, headers, postData;
+                  None if the page never paginated) and the session 'cookies', or None if scraping failed
         """
+        print(f"Capturing GraphQL pagination for {url} with Browserless.io")
         
-        # Create the context object with parameters
         context = {
             "url": url,
             "selector": selector,
-            "wait": wait_for,
-            "scrollCount": scroll_count,
-            "scrollDelay": scroll_delay
-        }
-        
-        # Make the API request
-        endpoint = f"{self.base_url}/function?token={self.api_key}"
-        payload = {
-            "code": function,
-            "context": context
+            "captureTimeout": capture_timeout,
+            "token": _MP_TOKEN,
+            "includeHtml": include_html
         }
         
+        slot = self._slots.get()
         try:
-            response = requests.post(endpoint, json=payload, timeout=120)
+            response = self._session.post(
+                self._function_endpoint(slot),
+                data=_function_body(_CAPTURE_FN_BYTES, context),
+                headers=_JSON_HEADERS,
+                timeout=120
+            )
             response.raise_for_status()
-            return response.text
-        except requests.exceptions.RequestException as e:
-            print(f"Error scraping with Browserless: {e}")
+            return orjson.loads(response.content)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            print(f"Error capturing GraphQL request with Browserless: {e}")
             return None
+        finally:
+            self._release_slot(slot)
+    
+    async def fetch_graphql_pages(self, capture, max_pages):
+        """
+        Fetch further result pages by replaying a captured GraphQL request directly
+        
+        Follows the response cursor from page to page, so no browser rendering or scrolling is needed.
+        
+        Args:
+            capture (dict): Result of capture_graphql
+            max_pages (int): Maximum number of pages to fetch
+            
+        Returns:
+            list: Decoded GraphQL payloads, in page order
+        """
+        request = capture.get('request') if capture else None
+        if not request or max_pages < 1:
+            return []
+        
+        # Replay with the browser's headers and session cookies
+        headers = {
+            name: value for name, value in request['headers'].items()
+            if name.lower() not in ('content-length', 'host', 'cookie')
+        }
+        headers['Cookie'] = '; '.join(f"{cookie['name']}={cookie['value']}" for cookie in capture.get('cookies', []))
+        
+        form = dict(parse_qsl(request['postData'], keep_blank_values=True))
+        try:
+            variables = orjson.loads(form['variables'])
+        except (KeyError, orjson.JSONDecodeError):
+            print("Captured GraphQL request has no variables to paginate with")
+            return []
+        
+        payloads = []
+        try:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=120)) as session:
+                for _ in range(max_pages):
+                    form['variables'] = orjson.dumps(variables).decode()
+                    async with session.post(request['url'], data=urlencode(form), headers=headers) as response:
+                        response.raise_for_status()
+                        body = await response.read()
+                    
+                    page_payloads = _decode_graphql_body(body)
+                    payloads.extend(page_payloads)
+                    
+                    # Stop once Facebook reports there is nothing more to load
+                    page_info = _find_page_info(page_payloads)
+                    if not page_info or not page_info.get('has_next_page') or not page_info.get('end_cursor'):
+                        break
+                    variables['cursor'] = page_info['end_cursor']
+        except aiohttp.ClientError as e:
+            print(f"Error fetching GraphQL pages: {e}")
+        
+        return payloads
     
     def extract_json_from_html(self, html_content):
         """
@@ -119,9 +571,13 @@ class BrowserlessClient:
         if not html_content:
             return None
         
+        # Pages without the marketplace feed can't contain the data, so skip parsing them at all
+        if _MP_TOKEN not in html_content:
+            return None
+        
         try:
-            # Parse the HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Parse only the script tags, with the C-based lxml parser
+            soup = BeautifulSoup(html_content, 'lxml', parse_only=SoupStrainer('script'))
             
             # Look for script tags containing JSON data
             json_data = None
@@ -130,23 +586,38 @@ class BrowserlessClient:
                 if not script_text:
                     continue
                 
-                # Look for marketplace listings JSON
-                if 'marketplace_search_feed_cards_feedback_actions_renderer' in script_text:
+                # Only the lines holding the marketplace token can contain a matching object
+                for line in _lines_containing(script_text, _MP_TOKEN):
                     # Extract JSON data using regex
-                    json_matches = re.findall(r'({.*})', script_text)
-                    for match in json_matches:
+                    json_match = _JSON_RE.search(line)
+                    if json_match:
                         try:
-                            data = json.loads(match)
-                            if 'require' in data and isinstance(data['require'], list):
+                            data = orjson.loads(json_match.group())
+                            if isinstance(data, dict) and isinstance(data.get('require'), list):
                                 for item in data['require']:
                                     if isinstance(item, list) and len(item) > 2:
-                                        if 'marketplace_search_feed_cards_feedback_actions_renderer' in str(item):
+                                        if _has_token(item):
                                             json_data = item[2]
                                             return json_data
-                        except:
+                        except orjson.JSONDecodeError:
                             continue
             
             return json_data
         except Exception as e:
             print(f"Error extracting JSON from HTML: {e}")
             return None
+
+
+def get_shared_client():
+    """
+    Return the process-wide BrowserlessClient, creating it on first use
+    
+    Returns:
+        BrowserlessClient: Client whose HTTP connections stay open for the life of the process
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = BrowserlessClient()
+            atexit.register(_shared_client.close)
+        return _shared_client
@@ -11,15 +11,20 @@ A Streamlit application that:
 Requirements:
 - streamlit
 - google-generativeai
-- pandas
+- pyarrow
 - Facebook_Marketplace_Scraper.py (must be in the same directory)
 """
 
 import os
 import re
-import json
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import orjson
 import streamlit as st
-import pandas as pd
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import pyarrow as pa
+from pyarrow import csv as pacsv
 import google.generativeai as genai
 from Facebook_Marketplace_Scraper import FacebookMarketplaceScraper
 from dotenv import load_dotenv
@@ -27,15 +32,26 @@ from dotenv import load_dotenv
 # Define the Gemini model name
 GEMINI_MODEL = "gemini-2.5-pro-exp-03-25"
 
-# Load environment variables from .env file
-load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), '.env'))
+# Paths resolved once at import
+_APP_DIR = Path(__file__).resolve().parent
+_ENV_PATH = _APP_DIR.parents[1] / '.env'
+_CSS_PATH = _APP_DIR / "static" / "style.css"
+
+# Streamlit re-executes this script on every interaction, so file reads are cached per process
+@st.cache_resource(show_spinner=False)
+def _load_env():
+    """Load environment variables from the .env file (once per process)"""
+    return load_dotenv(_ENV_PATH)
+
+@st.cache_resource(show_spinner=False)
+def _css_blob():
+    """Read the app stylesheet (once per process)"""
+    with open(_CSS_PATH, "rb") as f:
+        return f.read().decode()
 
-# Function to load and apply CSS from external file
+# Function to apply CSS from external file
 def load_css():
-    css_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "style.css")
-    with open(css_file, "r") as f:
-        css = f.read()
-    st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
+    st.markdown(f"<style>{_css_blob()}</style>", unsafe_allow_html=True)
 
 # Configure the page
 st.set_page_config(
@@ -45,6 +61,9 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Load environment variables from .env file
+_load_env()
+
 # Apply CSS
 load_css()
 
@@ -74,31 +93,216 @@ BROWSERLESS_API_KEY = get_api_key("BROWSERLESS_API_KEY")
 if BROWSERLESS_API_KEY:
     os.environ["BROWSERLESS_API_KEY"] = BROWSERLESS_API_KEY
 
-# Configure Gemini API
-def configure_gemini():
-    """Configure the Gemini API with the API key."""
+# Configure Gemini once per process and reuse the model across reruns
+@st.cache_resource(show_spinner=False)
+def get_model(model_name=GEMINI_MODEL):
+    """Configure the Gemini API with the API key and return the generative model."""
     # Configure Gemini with the API key
     genai.configure(api_key=GOOGLE_API_KEY)
-    return genai
+    return genai.GenerativeModel(model_name)
 
-# Function to analyze user preferences with Gemini
-def analyze_preferences(user_input):
+# Patterns for the rule-based preference parser, which answers simple queries without calling Gemini
+_MAKES = {
+    'acura': 'Acura', 'audi': 'Audi', 'bmw': 'BMW', 'buick': 'Buick', 'cadillac': 'Cadillac',
+    'chevrolet': 'Chevrolet', 'chevy': 'Chevrolet', 'chrysler': 'Chrysler', 'dodge': 'Dodge',
+    'ford': 'Ford', 'gmc': 'GMC', 'honda': 'Honda', 'hyundai': 'Hyundai', 'infiniti': 'Infiniti',
+    'jeep': 'Jeep', 'kia': 'Kia', 'lexus': 'Lexus', 'lincoln': 'Lincoln', 'mazda': 'Mazda',
+    'mercedes': 'Mercedes-Benz', 'mercedes-benz': 'Mercedes-Benz', 'mini': 'MINI',
+    'mitsubishi': 'Mitsubishi', 'nissan': 'Nissan', 'porsche': 'Porsche', 'ram': 'Ram',
+    'subaru': 'Subaru', 'tesla': 'Tesla', 'toyota': 'Toyota', 'volkswagen': 'Volkswagen',
+    'vw': 'Volkswagen', 'volvo': 'Volvo'
+}
+_MAKE_RE = re.compile(
+    r'\b(' + '|'.join(sorted(map(re.escape, _MAKES), key=len, reverse=True)) + r')\b(?:\s+([a-z0-9-]+)(?:\s+([a-z0-9-]+))?)?',
+    re.I
+)
+# Makes that are also ordinary words ("mini van"), only trusted when followed by a model
+_AMBIGUOUS_MAKES = frozenset({'mini', 'ram'})
+# Second words that belong to the model ("3 Series", "C Class"); Tesla's "Model 3" is handled by name
+_MODEL_SUFFIXES = frozenset({'series', 'class'})
+# A price needs a "$", a "k" suffix or a "dollars" suffix so it can't be confused with a year,
+# and neither a price nor a year may be a distance ("80k km", "2000 km")
+_NOT_DISTANCE = r'(?!\s*(?:km|kms|kilomet\w*|mi|miles?)\b)'
+_PRICE_RE = re.compile(
+    r'\$\s*(\d[\d,]*(?:\.\d+)?)(\s*k\b)?' + _NOT_DISTANCE
+    + r'|\b(\d+(?:\.\d+)?)\s*k\b' + _NOT_DISTANCE
+    + r'|\b(\d[\d,]*(?:\.\d+)?)\s*(?:dollars|bucks)\b',
+    re.I
+)
+_YEAR_RE = re.compile(r'(?<![$\d,.])\b((?:19|20)\d{2})\b(\s*\+)?(?!\s*k\b)' + _NOT_DISTANCE, re.I)
+_NUMBER_RE = re.compile(r'\d+')
+# Negated comparisons ("not older than") flip the bound, so each one is listed with the opposite
+# hint and the plain comparison only matches when it isn't negated
+_NOT_NEGATED = r'(?<!not )(?<!no )'
+_MAX_HINT_RE = re.compile(
+    r'\b(?:under|below|(?:not|no) more than|' + _NOT_NEGATED + r'less than|up to|max(?:imum)?|at most|budget|around|about)\W*$',
+    re.I
+)
+_MIN_HINT_RE = re.compile(
+    r'\b(?:over|above|(?:not|no) less than|' + _NOT_NEGATED + r'more than|at least|min(?:imum)?|from|starting at)\W*$',
+    re.I
+)
+_NEWER_HINT_RE = re.compile(
+    r'\b(?:(?:not|no) older than|' + _NOT_NEGATED + r'newer than|after|since|from|at least)\W*$',
+    re.I
+)
+_OLDER_HINT_RE = re.compile(
+    r'\b(?:(?:not|no) newer than|' + _NOT_NEGATED + r'older than|before|up to|until)\W*$',
+    re.I
+)
+# Words that can follow a make without being a model
+_NOT_MODELS = frozenset({
+    'and', 'or', 'under', 'below', 'over', 'above', 'for', 'with', 'around', 'about', 'from',
+    'between', 'in', 'that', 'car', 'cars', 'suv', 'truck', 'sedan', 'up', 'less', 'more', 'at',
+    'van', 'vans', 'minivan', 'not', 'no', 'newer', 'older'
+})
+
+def _range(values, text_before, upper_hint, lower_hint, lower_default):
     """
-    Use Gemini to analyze user preferences and return structured data.
+    Turn the numbers found in a query into a (min, max) pair.
+    
+    Args:
+        values (list): Numbers in the order they appear
+        text_before (list): Query text preceding each number
+        upper_hint (re.Pattern): Matches wording that makes a lone number an upper bound
+        lower_hint (re.Pattern): Matches wording that makes a lone number a lower bound
+        lower_default (bool): Treat a lone number without hints as a lower bound
+        
+    Returns:
+        tuple: (min, max), either of which may be None
+    """
+    if not values:
+        return None, None
+    if len(values) > 1:
+        return min(values), max(values)
+    if upper_hint.search(text_before[0]):
+        return None, values[0]
+    if lower_hint.search(text_before[0]) or lower_default:
+        return values[0], None
+    return None, values[0]
+
+def _fast_parse(user_input):
+    """
+    Extract car preferences from simple queries such as "Honda Civic under $15k, 2015+".
     
     Args:
         user_input (str): User's car preferences in natural language
         
     Returns:
-        dict: Structured car preferences
+        dict: Structured car preferences, or None if the query needs Gemini
+    """
+    make_match = _MAKE_RE.search(user_input)
+    if not make_match:
+        return None
+    
+    # Spans of the input explained by a price, year or model; any other number means the query
+    # says something (mileage, seats, ...) this parser doesn't understand
+    consumed = []
+    
+    prices, price_context = [], []
+    for match in _PRICE_RE.finditer(user_input):
+        amount = float((match.group(1) or match.group(3) or match.group(4)).replace(',', ''))
+        if match.group(2) or match.group(3):
+            amount *= 1000
+        prices.append(int(amount))
+        price_context.append(user_input[:match.start()])
+        consumed.append(match.span())
+    min_price, max_price = _range(prices, price_context, _MAX_HINT_RE, _MIN_HINT_RE, False)
+    
+    years, year_context = [], []
+    for match in _YEAR_RE.finditer(user_input):
+        years.append(int(match.group(1)))
+        # "2015+" reads as "2015 or newer"
+        year_context.append('' if match.group(2) else user_input[:match.start()])
+        consumed.append(match.span())
+    min_year, max_year = _range(years, year_context, _OLDER_HINT_RE, _NEWER_HINT_RE, True)
+    
+    def is_consumed(start, end):
+        return any(span_start <= start and end <= span_end for span_start, span_end in consumed)
+    
+    make_key = make_match.group(1).lower()
+    preferences = {"make": _MAKES[make_key]}
+    
+    # The model is the word after the make, plus a second word for names like "Model 3" or "3 Series"
+    first, second = make_match.group(2), make_match.group(3)
+    if (first and first.lower() not in _NOT_MODELS and not is_consumed(*make_match.span(2))
+            and not (first.isdigit() and len(first) > 2)):
+        words, model_end = [first], make_match.end(2)
+        if second and (first.lower() == 'model' or second.lower() in _MODEL_SUFFIXES):
+            words, model_end = [first, second], make_match.end(3)
+        preferences["model"] = ' '.join(word.title() if word.isalpha() else word.upper() for word in words)
+        consumed.append((make_match.start(2), model_end))
+    elif make_key in _AMBIGUOUS_MAKES:
+        return None
+    
+    if any(not is_consumed(*match.span()) for match in _NUMBER_RE.finditer(user_input)):
+        return None
+    
+    for field, value in (("min_price", min_price), ("max_price", max_price),
+                         ("min_year", min_year), ("max_year", max_year)):
+        if value is not None:
+            preferences[field] = value
+    
+    # Only skip Gemini when the query was specific enough
+    if len(preferences) < 3:
+        return None
+    
+    preferences["recommendation"] = "Parsed from input"
+    return preferences
+
+# Outermost JSON object in a Gemini response, which may wrap it in prose or code fences
+_GEMINI_JSON_RE = re.compile(r'({.*})', re.DOTALL)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+class _GeminiResponseError(ValueError):
+    """Raised when a Gemini response holds no usable JSON object; keeps the raw text for display"""
+    
+    def __init__(self, message, raw_text):
+        super().__init__(message)
+        self.raw_text = raw_text
+
+# Parse the JSON object out of a Gemini response
+def _extract_json(text):
+    """
+    Extract the JSON object from a Gemini response.
+    
+    Args:
+        text (str): Raw response text
+        
+    Returns:
+        dict: Parsed JSON object
     """
-    genai_client = configure_gemini()
+    # Try to extract JSON from the response
+    json_match = _GEMINI_JSON_RE.search(text)
+    if json_match:
+        return orjson.loads(json_match.group(1))
+    # If no JSON pattern found, try to parse the entire response
+    return orjson.loads(text)
+
+# Ask Gemini about an input; cached so resubmitting the same text skips the API call.
+# Streamlit doesn't hash underscore-prefixed arguments, so only the normalised key and model
+# name identify a cache entry, and exceptions aren't cached, so unusable responses are retried
+@st.cache_data(ttl=3600, show_spinner=False)
+def _generate_analysis(key, model_name, _user_input):
+    """
+    Run the Gemini preference analysis and parse its response.
     
+    Args:
+        key (str): Normalised user input (cache key only)
+        model_name (str): Gemini model to use (part of the cache key)
+        _user_input (str): User's original input, sent in the prompt
+        
+    Returns:
+        dict: Structured car preferences
+        
+    Raises:
+        _GeminiResponseError: If the response holds no JSON object
+    """
     # Create the prompt for Gemini
     prompt = f"""
     Based on the following user preferences for a car, extract key information and provide recommendations.
     
-    User input: "{user_input}"
+    User input: "{_user_input}"
     
     First, analyze what type of car would best suit their needs and preferences.
     
@@ -118,22 +322,41 @@ def analyze_preferences(user_input):
     """
     
     # Generate response from Gemini
-    model = genai_client.GenerativeModel(GEMINI_MODEL)
-    response = model.generate_content(prompt)
+    response = get_model(model_name).generate_content(prompt)
     
-    # Extract and parse JSON from the response
+    # Parse here so only usable responses are cached
     try:
-        # Try to extract JSON from the response
-        json_match = re.search(r'({.*})', response.text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1)
-            return json.loads(json_str)
-        else:
-            # If no JSON pattern found, try to parse the entire response
-            return json.loads(response.text)
-    except Exception as e:
+        preferences = _extract_json(response.text)
+    except orjson.JSONDecodeError as e:
+        raise _GeminiResponseError(str(e), response.text) from e
+    if not isinstance(preferences, dict):
+        raise _GeminiResponseError("Response JSON is not an object", response.text)
+    return preferences
+
+# Function to analyze user preferences with Gemini
+def analyze_preferences(user_input):
+    """
+    Use Gemini to analyze user preferences and return structured data.
+    
+    Args:
+        user_input (str): User's car preferences in natural language
+        
+    Returns:
+        dict: Structured car preferences
+    """
+    # Simple queries are parsed locally without a Gemini round trip
+    preferences = _fast_parse(user_input)
+    if preferences:
+        return preferences
+    
+    # Collapse case and whitespace so trivially different inputs share a cache entry
+    key = _WHITESPACE_RE.sub(' ', user_input.strip().lower())
+    try:
+        # st.cache_data hands back a copy, so callers can't mutate the cached dict
+        return _generate_analysis(key, GEMINI_MODEL, user_input)
+    except _GeminiResponseError as e:
         st.error(f"Error parsing Gemini response: {e}")
-        st.write("Raw response:", response.text)
+        st.write("Raw response:", e.raw_text)
         return None
 
 # Function to search Facebook Marketplace
@@ -186,6 +409,25 @@ def search_marketplace(preferences):
         st.write(traceback.format_exc())
         return []
 
+# Download a listing image; cached so reruns don't fetch it again
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch(url):
+    """
+    Download an image.
+    
+    Args:
+        url (str): Image URL
+        
+    Returns:
+        bytes: Image content, or None if the download failed
+    """
+    try:
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+        return response.content
+    except requests.exceptions.RequestException:
+        return None
+
 # Function to display car listings
 def display_listings(listings, preferences):
     """
@@ -201,6 +443,14 @@ def display_listings(listings, preferences):
     
     st.subheader(f"Top {len(listings)} Matches")
     
+    # Download all images at once instead of one card at a time
+    image_urls = [car.get("ImageURL") for car in listings]
+    # The cached _fetch needs the script's run context, which worker threads don't inherit
+    with ThreadPoolExecutor(
+        max_workers=len(listings), initializer=add_script_run_ctx, initargs=(None, get_script_run_ctx())
+    ) as executor:
+        images = list(executor.map(lambda url: _fetch(url) if url else None, image_urls))
+    
     # Create columns for the listings
     cols = st.columns(len(listings))
     
@@ -213,7 +463,9 @@ def display_listings(listings, preferences):
                 st.markdown('<div class="car-card">', unsafe_allow_html=True)
                 
                 # Display the car image
-                if "ImageURL" in car and car["ImageURL"]:
+                if images[i]:
+                    st.image(images[i], use_column_width=True)
+                elif car.get("ImageURL"):
                     st.image(car["ImageURL"], use_column_width=True)
                 
                 # Create a card-like display
@@ -288,11 +540,13 @@ def main():
         
         # Option to save results
         if listings:
-            df = pd.DataFrame(listings)
-            csv = df.to_csv(index=False)
+            # Arrow's C++ CSV writer formats the rows without going through pandas
+            table = pa.Table.from_pylist(listings)
+            csv_buffer = pa.BufferOutputStream()
+            pacsv.write_csv(table, csv_buffer)
             st.download_button(
                 label="Download Results as CSV",
-                data=csv,
+                data=csv_buffer.getvalue().to_pybytes(),
                 file_name="car_search_results.csv",
                 mime="text/csv"
             )
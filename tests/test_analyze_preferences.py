@@ -0,0 +1,57 @@
+"""Tests for the cached Gemini preference analysis in car_finder_app"""
+
+import os
+
+import pytest
+
+# Importing the app runs its Streamlit setup and the scraper's driver imports
+for _module in ('streamlit', 'google.generativeai', 'dotenv', 'pyarrow', 'requests',
+                'bs4', 'lxml', 'selectolax', 'splinter', 'selenium', 'webdriver_manager', 'aiohttp'):
+    pytest.importorskip(_module)
+
+# The app stops at import without an API key
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+
+import car_finder_app
+
+
+class _FakeModel:
+    """Stands in for genai.GenerativeModel, replying with queued response texts"""
+
+    def __init__(self, *texts):
+        self.texts = list(texts)
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        text = self.texts.pop(0)
+        return type("Response", (), {"text": text})()
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    car_finder_app._generate_analysis.clear()
+    model = _FakeModel()
+    monkeypatch.setattr(car_finder_app, "get_model", lambda model_name=None: model)
+    yield model
+    car_finder_app._generate_analysis.clear()
+
+
+def test_unparsable_response_is_not_cached(fake_model):
+    fake_model.texts = ["Sorry, I can't help with that.", '{"make": "Honda", "model": "Civic"}']
+
+    assert car_finder_app.analyze_preferences("something reliable for the family") is None
+    # Retrying asks Gemini again instead of replaying the bad response
+    assert car_finder_app.analyze_preferences("something reliable for the family") == {
+        "make": "Honda", "model": "Civic"
+    }
+
+
+def test_prompt_uses_original_text_and_cache_uses_normalised_text(fake_model):
+    fake_model.texts = ['{"make": "Honda"}']
+
+    car_finder_app.analyze_preferences("Something  Reliable for the FAMILY")
+    car_finder_app.analyze_preferences("something reliable for the family ")
+
+    assert len(fake_model.prompts) == 1
+    assert '"Something  Reliable for the FAMILY"' in fake_model.prompts[0]
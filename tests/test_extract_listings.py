@@ -0,0 +1,112 @@
+"""Tests for FacebookMarketplaceScraper._extract_listings and its parsing paths"""
+
+import orjson
+import pytest
+
+# The scraper module imports its browser drivers at import time
+for _module in ('bs4', 'lxml', 'selectolax', 'splinter', 'selenium', 'webdriver_manager', 'requests', 'aiohttp'):
+    pytest.importorskip(_module)
+
+from Facebook_Marketplace_Scraper import FacebookMarketplaceScraper
+
+
+def _listing(listing_id, title, amount):
+    """A listing node as it appears in the embedded JSON"""
+    return {
+        "marketplace_listing_title": title,
+        "price": {"amount": amount},
+        "url": f"/marketplace/item/{listing_id}/",
+    }
+
+
+def _json_page(*payloads):
+    """An HTML page embedding each payload in its own <script type="application/json"> tag"""
+    scripts = ''.join(
+        f'<script type="application/json">{orjson.dumps(payload).decode()}</script>'
+        for payload in payloads
+    )
+    return f'<html><head>{scripts}</head><body></body></html>'
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    # The scraper creates its output directory in the working directory
+    monkeypatch.chdir(tmp_path)
+    return FacebookMarketplaceScraper(headless=True, debug=False)
+
+
+def test_extract_listings_from_json_script(scraper):
+    html = _json_page({"marketplace_search_feed_items": [_listing(1, "2015 Honda Civic", "15000.00")]})
+
+    listings = scraper._extract_listings(html)
+
+    assert listings == [{
+        "Year": 2015,
+        "Make": "Honda",
+        "Model": "Civic",
+        "Price": 15000,
+        "URL": "https://www.facebook.com/marketplace/item/1/",
+        "Mileage": 0,
+    }]
+
+
+def test_process_json_data_reads_graphql_listing_nodes():
+    # Shape of a replayed Marketplace search GraphQL response
+    payload = {"data": {"marketplace_search": {"feed_units": {"edges": [
+        {"node": {"listing": {
+            "id": "1234",
+            "listing_price": {"amount": "15000.00", "formatted_amount": "CA$15,000"},
+            "marketplace_listing_title": "2015 Honda Civic",
+        }}},
+    ], "page_info": {"has_next_page": False, "end_cursor": None}}}}}
+    vehicles_list = []
+
+    FacebookMarketplaceScraper._process_json_data(payload, vehicles_list)
+
+    assert vehicles_list == [{
+        "Year": 2015,
+        "Make": "Honda",
+        "Model": "Civic",
+        "Price": 15000,
+        "URL": "https://www.facebook.com/marketplace/item/1234/",
+        "Mileage": 0,
+    }]
+
+
+@pytest.mark.parametrize("fields_order", [
+    ("id", "listing_price", "marketplace_listing_title"),  # Facebook's own order
+    ("marketplace_listing_title", "listing_price", "id"),
+])
+def test_extract_listings_keeps_each_listings_own_fields(scraper, fields_order):
+    nodes = []
+    for listing_id, title, amount in (("111", "2015 Honda Civic", "15000"), ("222", "2018 Toyota Corolla", "19000")):
+        fields = {
+            "id": listing_id,
+            "listing_price": {"amount": amount},
+            "marketplace_listing_title": title,
+        }
+        nodes.append({"listing": {
+            **{key: fields[key] for key in fields_order},
+            # Nested ids must never be taken for the listing's own
+            "location": {"reverse_geocode": {"city_page": {"id": "5551"}}},
+        }})
+    html = _json_page({"marketplace_search_feed_items": nodes})
+
+    listings = scraper._extract_listings(html)
+
+    assert [(car["Model"], car["Price"], car["URL"]) for car in listings] == [
+        ("Civic", 15000, "https://www.facebook.com/marketplace/item/111/"),
+        ("Corolla", 19000, "https://www.facebook.com/marketplace/item/222/"),
+    ]
+
+
+def test_extract_listings_from_several_json_scripts(scraper):
+    # More than one listing script goes through the shared process pool
+    html = _json_page(
+        {"marketplace_search_feed_items": [_listing(1, "2015 Honda Civic", "15000.00")]},
+        {"marketplace_search_feed_items": [_listing(2, "2018 Toyota Corolla", "19000.00")]},
+    )
+
+    listings = scraper._extract_listings(html)
+
+    assert [(car["Model"], car["Price"]) for car in listings] == [("Civic", 15000), ("Corolla", 19000)]
@@ -0,0 +1,76 @@
+"""Tests for the rule-based preference parser in car_finder_app"""
+
+import os
+
+import pytest
+
+# Importing the app runs its Streamlit setup and the scraper's driver imports
+for _module in ('streamlit', 'google.generativeai', 'dotenv', 'pyarrow', 'requests',
+                'bs4', 'lxml', 'selectolax', 'splinter', 'selenium', 'webdriver_manager', 'aiohttp'):
+    pytest.importorskip(_module)
+
+# The app stops at import without an API key
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+
+from car_finder_app import _fast_parse
+
+
+@pytest.mark.parametrize("text, expected", [
+    (
+        "Honda Civic under 15k, 2015+",
+        {"make": "Honda", "model": "Civic", "max_price": 15000, "min_year": 2015},
+    ),
+    (
+        "I want a toyota corolla between $8,000 and $12,000 from 2012 to 2018",
+        {"make": "Toyota", "model": "Corolla", "min_price": 8000, "max_price": 12000,
+         "min_year": 2012, "max_year": 2018},
+    ),
+    (
+        # The app's own placeholder phrasing
+        "Honda Civic not older than 2015, under $15k",
+        {"make": "Honda", "model": "Civic", "max_price": 15000, "min_year": 2015},
+    ),
+    (
+        "Honda Civic no older than 2014 under $12k",
+        {"make": "Honda", "model": "Civic", "max_price": 12000, "min_year": 2014},
+    ),
+    (
+        "Toyota Corolla older than 2010 no more than $5k",
+        {"make": "Toyota", "model": "Corolla", "max_price": 5000, "max_year": 2010},
+    ),
+    (
+        "Ford F-150 newer than 2016 under $30k",
+        {"make": "Ford", "model": "F-150", "max_price": 30000, "min_year": 2016},
+    ),
+    (
+        "Honda Civic 2015 with a budget under 12000 dollars",
+        {"make": "Honda", "model": "Civic", "max_price": 12000, "min_year": 2015},
+    ),
+    (
+        "Tesla Model 3 under $40k",
+        {"make": "Tesla", "model": "Model 3", "max_price": 40000},
+    ),
+    (
+        "BMW 3 Series under $20k 2014+",
+        {"make": "BMW", "model": "3 Series", "max_price": 20000, "min_year": 2014},
+    ),
+    (
+        "Mini Cooper under $12k 2015+",
+        {"make": "MINI", "model": "Cooper", "max_price": 12000, "min_year": 2015},
+    ),
+])
+def test_fast_parse_extracts_bounds(text, expected):
+    assert _fast_parse(text) == {**expected, "recommendation": "Parsed from input"}
+
+
+@pytest.mark.parametrize("text", [
+    "reliable family car budget $15000",
+    "a bmw that's fun",
+    # Distances are neither prices nor years, and numbers the parser can't place need Gemini
+    "Honda Civic under $15k with under 80k km",
+    "Honda civic less than 2000 km, $9k",
+    # "mini" here is not the make
+    "mini van under $10k 2012+",
+])
+def test_fast_parse_leaves_vague_queries_to_gemini(text):
+    assert _fast_parse(text) is None